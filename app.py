@@ -1,20 +1,89 @@
-import os, sqlite3, json, torch
-from datetime import datetime, timedelta
+import os, re, json, hashlib, queue, threading, time, zlib, orjson
+try:
+    # pysqlite3-binary statically links a current SQLite (JSONB needs 3.45+)
+    import pysqlite3 as sqlite3
+except ImportError:
+    import sqlite3
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
 from flask import Flask, render_template, request, jsonify, g
+from flask.json.provider import JSONProvider
 from typing import Dict, List, Optional
 from sentence_transformers import SentenceTransformer
+try:
+    import faiss
+except ImportError:
+    faiss = None
 from pokemon_research import PokemonResearchAgent as Agent_
 
+class OrjsonProvider(JSONProvider):
+    """Serve API responses through orjson instead of the stdlib encoder"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=str).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['DATABASE'] = 'chatbot.db'
-ENCODER = SentenceTransformer("all-MiniLM-L6-v2")
+# Dynamically int8-quantized ONNX export of MiniLM; set ENCODER_BACKEND=torch for the FP32 model
+app.config['ENCODER_BACKEND'] = os.getenv('ENCODER_BACKEND', 'onnx')
+app.config['ENCODER_ONNX_FILE'] = os.getenv('ENCODER_ONNX_FILE', 'onnx/model_quint8_avx2.onnx')
+
+def load_encoder() -> SentenceTransformer:
+    """Load the query encoder on the configured backend"""
+    if app.config['ENCODER_BACKEND'] == 'onnx':
+        return SentenceTransformer(
+            "all-MiniLM-L6-v2",
+            backend="onnx",
+            model_kwargs={"file_name": app.config['ENCODER_ONNX_FILE']}
+        )
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+ENCODER = load_encoder()
+
+# SQLite 3.45+ stores JSON columns as pre-parsed JSONB; older builds keep JSON text
+JSONB_SUPPORTED = sqlite3.sqlite_version_info >= (3, 45, 0)
+JSON_COLUMN = 'BLOB' if JSONB_SUPPORTED else 'TEXT'
+JSON_IN = 'jsonb(?)' if JSONB_SUPPORTED else '?'
+
+def json_out(column: str) -> str:
+    """SQL expression reading a JSON column back as JSON text"""
+    return f'json({column}) AS {column}' if JSONB_SUPPORTED else column
+
+# Hot-path SQL, kept as constants so every call hits sqlite3's per-connection statement cache
+SQL_TOUCH_SESSION = 'UPDATE chat_sessions SET last_active = CURRENT_TIMESTAMP WHERE session_id = ?'
+SQL_INSERT_MESSAGE = f'INSERT INTO messages (session_id, role, content, reasoning, metadata) VALUES (?, ?, ?, {JSON_IN}, {JSON_IN})'
+# Only the columns the chat view renders, read as plain tuples and zipped with MESSAGE_KEYS
+MESSAGE_KEYS = ('id', 'role', 'content', 'reasoning', 'timestamp', 'metadata')
+SQL_SELECT_MESSAGES = f'SELECT id, role, content, {json_out("reasoning")}, timestamp, {json_out("metadata")} FROM messages WHERE session_id = ? ORDER BY timestamp'
+SQL_SELECT_SESSIONS = 'SELECT * FROM chat_sessions ORDER BY last_active DESC'
+SQL_CACHE_BY_HASH = f'SELECT id, query, results, {json_out("reasoning")} FROM research_cache WHERE query_hash = ? AND expires_at > ?'
+SQL_CACHE_BY_ID = f'SELECT id, query, results, {json_out("reasoning")} FROM research_cache WHERE id = ? AND expires_at > ?'
+SQL_CACHE_NEW_VECTORS = 'SELECT id, query_vector FROM research_cache WHERE id > ? AND expires_at > ?'
+SQL_CACHE_HIT = 'UPDATE research_cache SET access_count=access_count+1 WHERE id = ?'
+SQL_CACHE_INSERT_INTO = '''INSERT OR REPLACE INTO research_cache 
+               (query_hash, query_vector, query, results, reasoning, expires_at) 
+               VALUES '''
+SQL_CACHE_ROW = f'(?, ?, ?, ?, {JSON_IN}, ?)'
+SQL_CACHE_INSERT = SQL_CACHE_INSERT_INTO + SQL_CACHE_ROW
+# Rows per multi-row INSERT; 500 rows x 6 parameters stays far below SQLite's bound-parameter limit
+CACHE_BATCH_ROWS = 500
 
 # Database initialization
 def init_db():
     """Initialize the database with required tables"""
     with app.app_context():
         db = get_db()
-        db.executescript('''
+        # Page size can only change before the first write (or via VACUUM, which WAL forbids)
+        if db.execute('PRAGMA page_count').fetchone()[0] == 0:
+            db.execute('PRAGMA page_size=8192')
+        # WAL is persistent in the database file, so it only needs setting once
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript(f'''
             CREATE TABLE IF NOT EXISTS chat_sessions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 session_id TEXT UNIQUE NOT NULL,
@@ -28,40 +97,91 @@ def init_db():
                 session_id TEXT NOT NULL,
                 role TEXT NOT NULL CHECK (role IN ('user', 'assistant', 'system')),
                 content TEXT NOT NULL,
-                reasoning TEXT,
+                reasoning {JSON_COLUMN},
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                metadata TEXT,
+                metadata {JSON_COLUMN},
                 FOREIGN KEY (session_id) REFERENCES chat_sessions (session_id)
             );
 
             CREATE TABLE IF NOT EXISTS research_cache (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                query_vector TEXT,
+                query_hash INTEGER,
+                query_vector BLOB,
                 query TEXT NOT NULL,
                 results TEXT NOT NULL,
-                reasoning TEXT,
+                reasoning {JSON_COLUMN},
                 cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL,
+                expires_at INTEGER NOT NULL,
                 access_count INTEGER DEFAULT 0
             );
+        ''')
+        # Databases created before query_hash / epoch expiry times need migrating
+        ensure_column(db, 'research_cache', 'query_hash', 'INTEGER')
+        db.executescript('''
+            UPDATE research_cache SET expires_at = CAST(strftime('%s', expires_at) AS INTEGER)
+                WHERE typeof(expires_at) = 'text';
 
             CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id);
-            CREATE INDEX IF NOT EXISTS idx_research_cache_hash ON research_cache(query_vector);
+            DROP INDEX IF EXISTS idx_research_cache_hash;
+            CREATE INDEX IF NOT EXISTS idx_research_cache_query_hash ON research_cache(query_hash);
+            CREATE INDEX IF NOT EXISTS idx_research_cache_expires ON research_cache(expires_at);
         ''')
         db.commit()
 
+def ensure_column(db, table: str, column: str, decl: str):
+    """Add a column to an existing table if it is missing"""
+    columns = {row[1] for row in db.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+
+class ConnectionPool:
+    """Reuse configured SQLite connections across requests instead of reopening the file"""
+
+    def __init__(self, size: int):
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    @staticmethod
+    def connect() -> sqlite3.Connection:
+        """Open a connection and apply the per-connection PRAGMAs once"""
+        # A pooled connection moves between threads, but is only ever used by one at a time
+        db = sqlite3.connect(app.config['DATABASE'], cached_statements=256, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.executescript('''
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+        ''')
+        return db
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.connect()
+
+    def release(self, db: sqlite3.Connection):
+        if db.in_transaction:
+            db.rollback()
+        try:
+            self._idle.put_nowait(db)
+        except queue.Full:
+            db.close()
+
+app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 16))
+DB_POOL = ConnectionPool(app.config['DB_POOL_SIZE'])
+
 def get_db():
     """Get database connection"""
     if 'db' not in g:
-        g.db = sqlite3.connect(app.config['DATABASE'])
-        g.db.row_factory = sqlite3.Row
+        g.db = DB_POOL.acquire()
     return g.db
 
 def app_close_db(error):
-    """Close database connection"""
+    """Return the database connection to the pool"""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        DB_POOL.release(db)
 
 @app.teardown_appcontext
 def close_db(error):
@@ -73,6 +193,29 @@ def generate_session_id():
     import uuid
     return str(uuid.uuid4())
 
+def hash_query(query: str) -> int:
+    """Hash a normalized query into a signed 64-bit key for exact cache lookups"""
+    digest = hashlib.blake2b(query.strip().casefold().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+def dumps_json(value) -> str:
+    """Serialize a value to JSON text for a JSON column"""
+    return orjson.dumps(value).decode()
+
+# Text longer than this is stored zlib-compressed as a BLOB; shorter text would not shrink
+COMPRESS_MIN_BYTES = 512
+
+def pack_text(text: str):
+    """Compress long message/result text for storage"""
+    data = text.encode()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return text
+    return zlib.compress(data)
+
+def unpack_text(value) -> str:
+    """Inverse of pack_text; plain TEXT values pass through"""
+    return zlib.decompress(value).decode() if isinstance(value, bytes) else value
+
 class ChatHistory:
     """Manage chat history operations"""
     
@@ -113,106 +256,325 @@ class ChatHistory:
     @staticmethod
     def get_session_history(session_id: str) -> List[Dict]:
         """Get chat history for a session"""
-        db = get_db()
-        messages = db.execute(
-            'SELECT * FROM messages WHERE session_id = ? ORDER BY timestamp',
-            (session_id,)
-        ).fetchall()        
-        return [dict(msg) for msg in messages]
+        cursor = get_db().cursor()
+        cursor.row_factory = None
+        messages = cursor.execute(SQL_SELECT_MESSAGES, (session_id,)).fetchall()
+        history = [dict(zip(MESSAGE_KEYS, msg)) for msg in messages]
+        for msg in history:
+            msg['content'] = unpack_text(msg['content'])
+        return history
     
     @staticmethod
     def add_message(session_id: str, role: str, content:str, reasoning, metadata: Dict = None):
         """Add a message to chat history"""
+        ChatHistory.add_messages_bulk(session_id, [(role, content, reasoning, metadata)])
+
+    @staticmethod
+    def add_messages_bulk(session_id: str, rows: List[tuple]):
+        """Add (role, content, reasoning, metadata) rows to chat history in one transaction"""
         db = get_db()
-        
-        # Update session last_active
-        db.execute(
-            'UPDATE chat_sessions SET last_active = CURRENT_TIMESTAMP WHERE session_id = ?',
-            (session_id,)
-        )
-        
-        # Add message
-        db.execute(
-            'INSERT INTO messages (session_id, role, content, reasoning, metadata) VALUES (?, ?, ?, ?, ?)',
-            (session_id, role, content, json.dumps(reasoning), json.dumps(metadata) if metadata else None)
-        )
-        db.commit()
+
+        with db:
+            # Update session last_active
+            db.execute(SQL_TOUCH_SESSION, (session_id,))
+
+            # Add messages
+            db.executemany(
+                SQL_INSERT_MESSAGE,
+                [(session_id, role, pack_text(content), dumps_json(reasoning), dumps_json(metadata) if metadata else None)
+                 for role, content, reasoning, metadata in rows]
+            )
     
     @staticmethod
     def get_all_sessions() -> List[Dict]:
         """Get all chat sessions"""
         db = get_db()
-        sessions = db.execute(
-            'SELECT * FROM chat_sessions ORDER BY last_active DESC'
-        ).fetchall()
+        sessions = db.execute(SQL_SELECT_SESSIONS).fetchall()
         
         return [dict(session) for session in sessions]
 
+# Past this many cached queries, lookups go through a FAISS IVF-PQ index (if faiss is installed).
+# k-means needs at least one training point per inverted list, so lower values are raised to ANN_NLIST.
+app.config['ANN_MIN_ROWS'] = int(os.getenv('ANN_MIN_ROWS', 50_000))
+ANN_NLIST = 1024
+# Sidecar file holding the trained, empty IVF-PQ index; vectors are re-added from SQLite on load
+app.config['ANN_INDEX_PATH'] = os.getenv('ANN_INDEX_PATH', 'research_cache.faiss')
+
+class VectorIndex:
+    """In-memory matrix of unit-length query embeddings, mirrored from research_cache"""
+
+    def __init__(self, dim: int):
+        self.lock = threading.Lock()
+        self.last_id = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.ann = None
+        self.ann_state = None  # None, then "building" while training off the lock, or "failed"
+
+    @staticmethod
+    def decode(blob) -> np.ndarray:
+        """Decode a stored query_vector (float16 bytes, or JSON text from older rows)"""
+        if isinstance(blob, str):
+            vector = np.asarray(json.loads(blob), dtype=np.float32)
+            return vector / np.linalg.norm(vector)
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+    def sync(self, db):
+        """Pull rows inserted since the last sync, including ones written by other processes"""
+        build = False
+        with self.lock:
+            rows = db.execute(SQL_CACHE_NEW_VECTORS, (self.last_id, int(time.time()))).fetchall()
+            if rows:
+                # Only sync() advances last_id: add() may index a row before rows with lower ids,
+                # committed by other processes, have been seen. Rows add() indexed are skipped here.
+                row_ids = [row['id'] for row in rows]
+                self.last_id = max(self.last_id, max(row_ids))
+                known = np.isin(row_ids, self.ids)
+                rows = [row for row, seen in zip(rows, known) if not seen]
+            if rows:
+                build = self._append([row['id'] for row in rows], [self.decode(row['query_vector']) for row in rows])
+        if build:
+            self._start_ann_build()
+
+    def _append(self, ids: List[int], vectors: List[np.ndarray]) -> bool:
+        """Append vectors (lock held); returns True when the ANN index should now be built"""
+        new_ids, new_vectors = np.asarray(ids, dtype=np.int64), np.stack(vectors)
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.vectors = np.concatenate([self.vectors, new_vectors])
+        if self.ann is not None:
+            self.ann.add_with_ids(new_vectors, new_ids)
+        elif (faiss is not None and self.ann_state is None
+              and len(self.ids) >= max(app.config['ANN_MIN_ROWS'], ANN_NLIST)):
+            self.ann_state = "building"
+            return True
+        return False
+
+    def _start_ann_build(self):
+        """Train the ANN index on a background thread; lookups stay exact until it is ready"""
+        threading.Thread(target=self._build_ann, name='ann-build', daemon=True).start()
+
+    def _build_ann(self):
+        """Switch lookups to an IVF-PQ index, training it once and persisting it to the sidecar
+
+        Training takes tens of seconds at the default size, so it runs on a snapshot without
+        the lock; rows added or removed meanwhile are applied before the index is swapped in.
+        """
+        with self.lock:
+            ids, vectors = self.ids, self.vectors
+        try:
+            dim = vectors.shape[1]
+            path = app.config['ANN_INDEX_PATH']
+            index = faiss.read_index(path) if os.path.exists(path) else None
+            if index is None or index.d != dim or not index.is_trained:
+                quantizer = faiss.IndexFlatIP(dim)
+                index = faiss.IndexIVFPQ(quantizer, dim, ANN_NLIST, 48, 8, faiss.METRIC_INNER_PRODUCT)
+                index.train(vectors)
+                faiss.write_index(index, path)
+            index.reset()
+            index.nprobe = 16
+            index.add_with_ids(vectors, ids)
+        except Exception as e:
+            # Keep answering from the exact NumPy scan rather than failing every later add
+            app.logger.warning("Could not build the ANN index, staying on exact search: %s", e)
+            with self.lock:
+                self.ann_state = "failed"
+            return
+        with self.lock:
+            added = ~np.isin(self.ids, ids)
+            if added.any():
+                index.add_with_ids(self.vectors[added], self.ids[added])
+            removed = ids[~np.isin(ids, self.ids)]
+            if len(removed):
+                index.remove_ids(removed)
+            self.ann = index
+            self.ann_state = None
+
+    def add(self, entry_id: int, vector: np.ndarray):
+        """Add a freshly cached vector unless a concurrent sync already picked it up"""
+        build = False
+        with self.lock:
+            if not (self.ids == entry_id).any():
+                build = self._append([entry_id], [vector])
+        if build:
+            self._start_ann_build()
+
+    def remove(self, entry_id: int):
+        """Drop a vector whose row has expired or been deleted"""
+        with self.lock:
+            keep = self.ids != entry_id
+            self.ids, self.vectors = self.ids[keep], self.vectors[keep]
+            if self.ann is not None:
+                self.ann.remove_ids(np.asarray([entry_id], dtype=np.int64))
+
+    def best_match(self, query_vector: np.ndarray):
+        """Return (id, cosine score) of the closest cached query, or None when empty"""
+        with self.lock:
+            ids, vectors = self.ids, self.vectors
+            if self.ann is not None:
+                # PQ scores are approximate: re-rank the candidates exactly before thresholding
+                _, candidates = self.ann.search(query_vector[None, :], 8)
+                rows = np.flatnonzero(np.isin(ids, candidates[0]))
+                ids, vectors = ids[rows], vectors[rows]
+        if len(ids) == 0:
+            return None
+        scores = vectors @ query_vector
+        best = int(scores.argmax())
+        return int(ids[best]), float(scores[best])
+
+@lru_cache(maxsize=2048)
+def encode_query(query: str) -> np.ndarray:
+    """Encode a query to a unit-length vector, so cosine similarity is a dot product
+
+    Memoized so a cache miss does not encode the same query again when caching its result.
+    The returned array is shared between callers and therefore read-only.
+    """
+    vector = ENCODER.encode(query, normalize_embeddings=True).astype(np.float32)
+    vector.flags.writeable = False
+    return vector
+
 class ResearchCache:
     """Manage research result caching"""
+
+    vectors = VectorIndex(ENCODER.get_sentence_embedding_dimension())
     
     @staticmethod
     def get_cached_research(query: str) -> Optional[Dict]:
         """Get cached research results"""
 
         db = get_db()
-        query_cache = db.execute(
-            'SELECT id, query_vector, query, results, reasoning FROM research_cache WHERE expires_at > CURRENT_TIMESTAMP',
-        ).fetchall()
-        if len(query_cache) == 0:
+        # Exact repeats of a query are answered by the hash index without encoding
+        entry = db.execute(SQL_CACHE_BY_HASH, (hash_query(query), int(time.time()))).fetchone()
+        if entry is not None:
+            return ResearchCache._cache_hit(db, entry)
+
+        vectors = ResearchCache.vectors
+        vectors.sync(db)
+        if len(vectors.ids) == 0:
             return
-        query_vector = torch.Tensor(ENCODER.encode([query]))
-        cache_vectors = torch.Tensor([json.loads(qc['query_vector']) for qc in query_cache])
-        similarity_scores = ENCODER.similarity(query_vector, cache_vectors)
-        max_score = torch.max(similarity_scores, 1)
-        if max_score.values[0] >= 0.95:
-            # Update access count
-            max_query = max_score.indices[0].item()
-            entry = query_cache[max_query]
-            db.execute(
-                'UPDATE research_cache SET access_count=access_count+1 WHERE id = ?',
-                (entry['id'],)
-            )
-            db.commit()
-            
-            return {
-                'cached_query': entry['query'],
-                'results': entry['results'],
-                'reasoning': json.loads(entry["reasoning"])
-            }
+        query_vector = encode_query(query)
+        while (match := vectors.best_match(query_vector)) is not None and match[1] >= 0.95:
+            entry = db.execute(SQL_CACHE_BY_ID, (match[0], int(time.time()))).fetchone()
+            if entry is not None:
+                return ResearchCache._cache_hit(db, entry)
+            # Expired or cleaned up since it was indexed
+            vectors.remove(match[0])
+
+    @staticmethod
+    def _cache_hit(db, entry) -> Dict:
+        """Count an access to a cache entry and return its payload"""
+        db.execute(SQL_CACHE_HIT, (entry['id'],))
+        db.commit()
+
+        return {
+            'cached_query': entry['query'],
+            'results': unpack_text(entry['results']),
+            'reasoning': orjson.loads(entry["reasoning"])
+        }
     
     @staticmethod
     def cache_research(query: str, results, reasoning, cache_hours: int = 24):
         """Cache research results"""
-        query_vector = json.dumps(ENCODER.encode([query])[0].tolist())
-        expires_at = datetime.now() + timedelta(hours=cache_hours)
+        query_vector = encode_query(query)
+        expires_at = int(time.time()) + cache_hours * 3600
         
         db = get_db()
-        db.execute(
-            '''INSERT OR REPLACE INTO research_cache 
-               (query_vector, query, results, reasoning, expires_at) 
-               VALUES (?, ?, ?, ?, ?)''',
-            (query_vector, query, results, json.dumps(reasoning), expires_at)
+        cursor = db.execute(
+            SQL_CACHE_INSERT,
+            ResearchCache._cache_row(query, query_vector, results, reasoning, expires_at)
         )
         db.commit()
+        ResearchCache.vectors.add(cursor.lastrowid, query_vector)
+
+    @staticmethod
+    def cache_research_many(entries: List[tuple], cache_hours: int = 24):
+        """Cache (query, results, reasoning) entries in bulk, e.g. to seed or warm the cache"""
+        if not entries:
+            return
+        query_vectors = ENCODER.encode([query for query, _, _ in entries], normalize_embeddings=True)
+        expires_at = int(time.time()) + cache_hours * 3600
+        rows = [
+            ResearchCache._cache_row(query, query_vector, results, reasoning, expires_at)
+            for (query, results, reasoning), query_vector in zip(entries, query_vectors)
+        ]
+
+        db = get_db()
+        db.commit()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            for start in range(0, len(rows), CACHE_BATCH_ROWS):
+                chunk = rows[start:start + CACHE_BATCH_ROWS]
+                db.execute(
+                    SQL_CACHE_INSERT_INTO + ', '.join([SQL_CACHE_ROW] * len(chunk)),
+                    [param for row in chunk for param in row]
+                )
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        ResearchCache.vectors.sync(db)
+
+    @staticmethod
+    def _cache_row(query: str, query_vector: np.ndarray, results, reasoning, expires_at) -> tuple:
+        """Bind parameters for one research_cache row"""
+        return (hash_query(query), query_vector.astype(np.float16).tobytes(), query, pack_text(results), dumps_json(reasoning), expires_at)
     
     @staticmethod
     def cleanup_expired():
         """Remove expired cache entries"""
         db = get_db()
-        db.execute('DELETE FROM research_cache WHERE expires_at < CURRENT_TIMESTAMP')
+        db.execute('DELETE FROM research_cache WHERE expires_at < ?', (int(time.time()),))
         db.commit()
 
 
+# Greetings and acknowledgements get a canned reply instead of a research run
+TRIVIAL_QUERY = re.compile(
+    r"(hi|hello|hey|yo|hiya|thanks?( you)?|thx|ok(ay)?|cool|bye|good (morning|afternoon|evening|night))[\s!.?]*",
+    re.IGNORECASE
+)
+TRIVIAL_RESPONSE = "Hi! Ask me anything about Pokemon - species, stats, moves, types, abilities or evolutions - and I'll research it for you."
+
 class DeepResearchBot:
     """Main chatbot class with research capabilities"""
     
     def __init__(self):
         self.research_cache = ResearchCache()
         self.agent = Agent_(simulation=False)
+        # Single-flight: concurrent identical queries share one research run
+        self._inflight: Dict[int, Future] = {}
+        self._inflight_lock = threading.Lock()
     
     def conduct_research(self, query: str) -> Dict:
         """Conduct deep research on a query"""
+        # Trivial messages skip the encoder, cache and agent entirely
+        if len(query.strip()) < 2 or TRIVIAL_QUERY.fullmatch(query.strip()):
+            return {
+                'results': TRIVIAL_RESPONSE,
+                'reasoning': [],
+                'cached_query': ''
+            }
+
+        key = hash_query(query)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._inflight[key] = Future()
+        if not is_owner:
+            return future.result()
+
+        try:
+            research_results = self._research(query)
+            future.set_result(research_results)
+            return research_results
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _research(self, query: str) -> Dict:
+        """Answer from the cache, or research and cache the result"""
         # Check cache first
         cached_result = self.research_cache.get_cached_research(query)
         if cached_result:
@@ -221,12 +583,13 @@ class DeepResearchBot:
         # Simulate research process (replace with actual research logic)
         research_results = self.agent.research(query)
         
-        # Cache results
-        self.research_cache.cache_research(
-            query, 
-            research_results["results"], 
-            research_results["reasoning"], 
-        )
+        # Cache results; unsuccessful ones are retried next time instead
+        if research_results.get("success", True):
+            self.research_cache.cache_research(
+                query, 
+                research_results["results"], 
+                research_results["reasoning"], 
+            )
         
         research_results["cached_query"] = ""
         return research_results
@@ -234,6 +597,16 @@ class DeepResearchBot:
 # Initialize bot
 research_bot = DeepResearchBot()
 
+# Research (encoder, DB and agent calls) runs on a bounded pool instead of the request thread
+app.config['RESEARCH_WORKERS'] = int(os.getenv('RESEARCH_WORKERS', 8))
+app.config['RESEARCH_TIMEOUT'] = int(os.getenv('RESEARCH_TIMEOUT', 300))
+EXECUTOR = ThreadPoolExecutor(max_workers=app.config['RESEARCH_WORKERS'], thread_name_prefix='research')
+
+def run_in_app_context(func, *args):
+    """Run func on a worker thread inside an application context, so get_db works"""
+    with app.app_context():
+        return func(*args)
+
 # Routes
 @app.route('/')
 def index():
@@ -288,7 +661,11 @@ def send_message(session_id):
     
     # Generate bot response
     # try:
-    research_result = research_bot.conduct_research(user_message)
+    future = EXECUTOR.submit(run_in_app_context, research_bot.conduct_research, user_message)
+    try:
+        research_result = future.result(timeout=app.config['RESEARCH_TIMEOUT'])
+    except FutureTimeout:
+        return jsonify({'error': 'Research is taking too long, please try again shortly'}), 504
    
     # Save bot response with metadata
     metadata = {
@@ -1,11 +1,11 @@
 '''For debug: Database content inspection and manual modification'''
 
 import sqlite3
-import pokebase as pb
 
-dbcon = sqlite3.connect("chatbot.db")
-for table in ["chat_sessions", "messages", "research_cache"]:
-    # dbcon.execute(f"drop table {table}")
-    dbcon.execute(f"delete from {table}")
-    print(table, dbcon.execute(f"select * from {table}").fetchall())
-dbcon.commit()
+tables = ["chat_sessions", "messages", "research_cache"]
+dbcon = sqlite3.connect("chatbot.db", isolation_level=None)
+# dbcon.executescript("".join(f"drop table {table};" for table in tables))
+dbcon.executescript("BEGIN;" + "".join(f"delete from {table};" for table in tables) + "COMMIT;")
+for table in tables:
+    print(table, dbcon.execute(f"select count(*) from {table}").fetchone()[0])
+dbcon.close()
@@ -1,9 +1,385 @@
-import inspect, json, dotenv, os
-from typing import Any, Dict, List, Callable, Optional
-from openai import OpenAI
-import pokebase.loaders as loaders
+import hashlib, importlib.metadata, inspect, logging, dotenv, os, orjson, re, sys, threading, time, types
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Callable, Optional, Union, get_args, get_origin
+from openai import OpenAI, APITimeoutError, RateLimitError
+try:
+    import redis
+except ImportError:
+    redis = None
 
-dotenv.load_dotenv(".env")
+@lru_cache(maxsize=1)
+def _load_env_once() -> bool:
+    """Load .env into the environment the first time it is needed"""
+    return dotenv.load_dotenv(".env")
+
+# Loaded at import as before: app.py reads its config from the environment right after importing us
+_load_env_once()
+
+logger = logging.getLogger(__name__)
+
+# Node kinds for _explore_object_recursively, dispatched on the exact type of each node.
+# Types not listed are resolved once through isinstance checks and then memoized here,
+# so pokebase's resource classes cost a single dict lookup after their first appearance.
+_LEAF, _LIST, _DICT, _OBJECT, _RESOURCE, _OTHER = "leaf", "list", "dict", "object", "resource", "other"
+_NODE_KINDS: Dict[type, str] = {
+    type(None): _LEAF, str: _LEAF, int: _LEAF, float: _LEAF, bool: _LEAF,
+    list: _LIST, dict: _DICT,  # pokebase's APIResource is registered by _get_loaders()
+}
+
+# Exact primitive types; subclasses (e.g. IntEnum) still go through _resolve_node_kind
+_PRIMITIVE_TYPES = frozenset(t for t, kind in _NODE_KINDS.items() if kind is _LEAF)
+
+# Attributes a pokebase APIResource has before it is loaded
+_RESOURCE_STUB_KEYS = ("name", "endpoint", "id_", "url")
+
+def _resolve_node_kind(node: Any) -> str:
+    """Classify a node whose type is not yet in _NODE_KINDS and remember the answer"""
+    if isinstance(node, (str, int, float, bool)):
+        kind = _LEAF
+    elif isinstance(node, list):
+        kind = _LIST
+    elif isinstance(node, dict):
+        kind = _DICT
+    elif hasattr(node, '__dict__'):
+        kind = _OBJECT
+    else:
+        kind = _OTHER
+    _NODE_KINDS[type(node)] = kind
+    return kind
+
+# Default output size cap (approximate JSON bytes) for _explore_object_recursively,
+# and the size charged for each key of an explored dict (quotes, colon, comma, short name)
+EXPLORE_MAX_BYTES = 16 * 1024
+_ENTRY_BYTES = 14
+
+def _truncate_pending(stack: deque) -> None:
+    """Drop the unexplored work items once the byte budget is spent, marking each cut container"""
+    pending: Dict[int, tuple] = {}
+    for parent, key, _, _ in stack:
+        entry = pending.setdefault(id(parent), (parent, []))
+        entry[1].append(key)
+    for parent, keys in pending.values():
+        if type(parent) is list:
+            # Items are explored in order, so the pending ones are always a suffix of the list
+            del parent[min(keys):]
+            parent.append({"_truncated": "byte budget exhausted"})
+        else:
+            for key in keys:
+                del parent[key]
+            parent["_truncated"] = "byte budget exhausted"
+    stack.clear()
+
+# Upper bound on pokebase lookups run concurrently for one assistant turn
+MAX_TOOL_WORKERS = 8
+
+# Default sampling temperature for research turns; 0 keeps answers (and the research memo) reproducible
+RESEARCH_TEMPERATURE = 0
+
+RESEARCH_SYSTEM_PROMPT = """You are a Pokemon research assistant with access to the pokebase library functions.
+
+IMPORTANT INSTRUCTIONS:
+1. Use the available pokebase functions to gather detailed Pokemon data
+2. When you receive abstract objects in function responses, they have been automatically explored using __dict__ recursively
+3. The function responses contain comprehensive nested data structures - examine them carefully
+4. Look for relationships between different data points (e.g., Pokemon types, abilities, stats, moves)
+5. Be persistent - if one approach doesn't work, try different function calls or parameters
+6. If you encounter errors, try alternative approaches or similar Pokemon names
+7. Always provide analysis even with partial data
+8. Use specific Pokemon names, move names, type names as they appear in the Pokemon database
+9. AVOID REPEATING THE SAME FUNCTION CALLS - if you see [CACHED] in a response, that means you already made that exact call
+10. Build upon previous results rather than repeating the same queries
+11. If you get sufficient data, proceed to analysis rather than making more calls
+
+Available functions are all from pokebase.loaders module and are prefixed with 'pokebase_'.
+
+Your goal is to provide comprehensive, accurate, and insightful Pokemon research based on the user's query."""
+
+# Tool outputs are sent in full only on the turn right after the call; older ones are
+# replaced by a short preview, since the model has already read them
+TOOL_SUMMARY_CHARS = 500
+
+# Approximate JSON size (bytes) of one explored tool result as cached
+TOOL_RESULT_BUDGET = 8 * 1024
+
+# Hard cap on the tool message content handed to the model; the full result stays cached
+TOOL_CONTENT_MAX = 4096
+
+def _clip_tool_content(content: str) -> str:
+    """Cap a tool result at TOOL_CONTENT_MAX characters before it goes into the conversation"""
+    if len(content) <= TOOL_CONTENT_MAX:
+        return content
+    return f"{content[:TOOL_CONTENT_MAX]}\n... [{len(content) - TOOL_CONTENT_MAX} characters elided]"
+
+def _summarize_tool_content(content: str) -> str:
+    """Shorten a tool output the model has already seen to a preview"""
+    if len(content) <= TOOL_SUMMARY_CHARS:
+        return content
+    return f"{content[:TOOL_SUMMARY_CHARS]}... [truncated from {len(content)} characters after use]"
+
+def _collect_tool_results(messages: List[Dict]) -> List[Dict]:
+    """The tool outputs of a conversation as {"tool": name, "content": text} entries"""
+    return [
+        {"tool": msg.get("name", "unknown"), "content": msg.get("content", "")}
+        for msg in messages if msg.get("role") == "tool"
+    ]
+
+def _format_tool_results(tool_results: List[Dict]) -> str:
+    """
+    Lay out tool results for a prompt as labelled blocks
+    
+    The contents are already JSON text (or plain error messages), so they are inserted verbatim
+    rather than encoded again as JSON strings, which would escape every quote inside them.
+    """
+    return "\n\n".join(f"[{result['tool']}]\n{result['content']}" for result in tool_results)
+
+def _compact_history(messages: List[Dict], fresh_from: int) -> List[Dict]:
+    """Messages to send, with tool outputs before index fresh_from shortened to previews"""
+    return [
+        {**msg, "content": _summarize_tool_content(msg["content"])}
+        if i < fresh_from and msg["role"] == "tool" else msg
+        for i, msg in enumerate(messages)
+    ]
+
+# Closing request when the tool loop ends without an answer; the model then answers in the
+# same conversation instead of a separate synthesis call re-sending the results
+SUMMARIZE_NOW_PROMPT = ("Summarize now with the data you already have. Answer the original question as "
+                        "completely as possible and mention any limitations or missing data.")
+
+# Chat completion attempts on rate limits/timeouts, with exponential backoff between them (seconds)
+CHAT_MAX_ATTEMPTS = 3
+CHAT_BACKOFF_MIN = 1
+CHAT_BACKOFF_MAX = 30
+
+# Pokemon named in a query are prefetched before the first model turn, at most this many
+BULK_FETCH_MAX = 6
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9]*(?:-[a-z0-9]+)*")
+
+# After the name list failed to load, prefetch is skipped for this long (seconds) before retrying
+POKEMON_NAMES_RETRY_AFTER = 300
+_pokemon_names_failed_at = None
+
+@lru_cache(maxsize=1)
+def _pokemon_names() -> frozenset:
+    """All Pokemon names known to the API (one list request, cached by pokebase on disk)"""
+    from pokebase.interface import APIResourceList
+    return frozenset(APIResourceList("pokemon").names)
+
+def _find_pokemon_names(query: str) -> List[str]:
+    """Pokemon names mentioned in a query, in order of appearance and without repeats"""
+    global _pokemon_names_failed_at
+    # lru_cache does not cache exceptions, so a failure is remembered here instead
+    if _pokemon_names_failed_at is not None and time.monotonic() - _pokemon_names_failed_at < POKEMON_NAMES_RETRY_AFTER:
+        return []
+    try:
+        known = _pokemon_names()
+    except Exception as e:
+        _pokemon_names_failed_at = time.monotonic()
+        logger.warning("Could not load the Pokemon name list, skipping prefetch for %ss: %s", POKEMON_NAMES_RETRY_AFTER, e)
+        return []
+    _pokemon_names_failed_at = None
+    names = []
+    for word in _WORD_RE.findall(query.lower()):
+        if word in known and word not in names:
+            names.append(word)
+            if len(names) == BULK_FETCH_MAX:
+                break
+    return names
+
+# Batch API jobs are polled at this interval (seconds) until they reach a terminal status
+BATCH_POLL_INTERVAL = 30
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# JSON schema types for exact annotation types
+_TYPE_MAP = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object"
+}
+
+# get_origin() of Optional[X] and of X | None (PEP 604, Python 3.10+)
+_UNION_ORIGINS = (Union, getattr(types, "UnionType", Union))
+
+# Pure helpers shared by every agent (and every reload of pokebase) in the process. The
+# returned fragments are shared, so callers copy them before adding to them.
+@lru_cache(maxsize=None)
+def _get_param_type(annotation) -> Dict[str, Any]:
+    """Convert a Python type annotation to a JSON schema fragment"""
+    if annotation is inspect.Parameter.empty:
+        return {"type": "string"}  # Default to string if no annotation
+    
+    origin = get_origin(annotation)
+    if origin in _UNION_ORIGINS:
+        # Optional[X] is Union[X, None] (or X | None); describe X
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _get_param_type(args[0]) if len(args) == 1 else {"type": "string"}
+    if origin is list:
+        args = get_args(annotation)
+        return {"type": "array", "items": _get_param_type(args[0]) if args else {"type": "string"}}
+    if origin is dict:
+        return {"type": "object"}
+    
+    return {"type": _TYPE_MAP.get(annotation, "string")}
+
+# One "name: description" entry per line; accepts Sphinx (":param name: ..."), Google
+# ("name (type): ...") and plain "name: ..." or "name - ..." styles. Lines indented deeper
+# than the entry continue its description.
+_PARAM_DESC_RE = re.compile(
+    r'^(?P<indent>[ \t]*)(?::param[ \t]+(?:\w+[ \t]+)?)?(?P<name>\w+)[ \t]*(?:\([^)\n]*\))?[ \t]*[:\-][ \t]*'
+    r'(?P<desc>\S.*?)[ \t]*(?P<more>(?:\n(?P=indent)[ \t]+\S.*)*)$',
+    re.M
+)
+
+@lru_cache(maxsize=512)
+def _parse_param_descriptions(docstring: str) -> Dict[str, str]:
+    """Extract every parameter description from a docstring in a single pass"""
+    descriptions = {}
+    if docstring:
+        for match in _PARAM_DESC_RE.finditer(docstring):
+            description = match["desc"]
+            if match["more"]:
+                description = " ".join([description, *(line.strip() for line in match["more"].split("\n") if line)])
+            descriptions.setdefault(match["name"], description)
+    return descriptions
+
+@lru_cache(maxsize=None)
+def _clean_docstring(docstring: str) -> str:
+    """Clean and format docstring for OpenAI function description"""
+    if not docstring:
+        return "Pokemon data function"
+    
+    # Take first line or first sentence
+    lines = docstring.strip().split('\n')
+    first_line = lines[0].strip()
+    
+    # Limit length for OpenAI function descriptions
+    if len(first_line) > 200:
+        first_line = first_line[:197] + "..."
+    
+    return first_line
+
+# Introspection results per loader function. Functions hash by identity, so a reloaded
+# pokebase only re-parses the functions that actually changed.
+@lru_cache(maxsize=512)
+def _sig_cache(func: Callable) -> tuple:
+    """Parse a function signature into ((param name, JSON schema fragment), ...) and (required names, ...)"""
+    params = []
+    required = []
+    for param_name, param in inspect.signature(func).parameters.items():
+        try:
+            param_type = _get_param_type(param.annotation)
+        except TypeError:  # unhashable annotation; these are not valid types anyway
+            param_type = {"type": "string"}
+        params.append((param_name, param_type))
+        # Add to required if no default value
+        if param.default == inspect.Parameter.empty:
+            required.append(param_name)
+    return tuple(params), tuple(required)
+
+@lru_cache(maxsize=512)
+def _doc_cache(func: Callable) -> tuple:
+    """Parse a function docstring into (tool description, {param name: description})"""
+    doc = inspect.getdoc(func) or "No description available"
+    desc_map = _parse_param_descriptions(doc)
+    param_descs = {
+        param_name: desc_map.get(param_name, f"Parameter {param_name}")
+        for param_name in inspect.signature(func).parameters
+    }
+    return _clean_docstring(doc), param_descs
+
+# Tool results kept in an agent's function cache before the least recently used are evicted;
+# with Redis configured, evicted results are still found there
+FUNCTION_CACHE_SIZE = 1024
+
+class BoundedCache(OrderedDict):
+    """Dict holding at most maxsize entries, evicting the least recently used on insert"""
+    
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+# OpenAI clients shared by all agents, keyed by API key, so the HTTP connection pool (and its
+# TLS sessions) is reused across agents and across the requests of one research loop
+_CLIENTS: Dict[Optional[str], OpenAI] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _get_client(api_key: Optional[str]) -> OpenAI:
+    """Return the shared OpenAI client for an API key, creating it on first use"""
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(api_key)
+            if client is None:
+                client = _CLIENTS[api_key] = OpenAI(api_key=api_key)
+    return client
+
+# Keep-alive connections kept open to pokeapi.co (at least one per concurrent tool call)
+POKEAPI_POOL_SIZE = 20
+
+@lru_cache(maxsize=1)
+def _get_loaders():
+    """Import pokebase.loaders on first use, so simulation-mode agents never import pokebase"""
+    import requests
+    import pokebase.api
+    import pokebase.loaders as loaders
+    from pokebase.interface import APIResource
+    _NODE_KINDS[APIResource] = _RESOURCE
+    
+    # pokebase fetches through the module-level requests.get, opening a new connection (and TLS
+    # handshake) per resource; route it through one pooled keep-alive session instead
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=POKEAPI_POOL_SIZE, pool_maxsize=POKEAPI_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    pokebase.api.requests = session
+    return loaders
+
+# Tool results are shared across processes through Redis when REDIS_URL is set
+# (e.g. redis://host:6379/0, or unix:///run/redis.sock on the same machine); kept for a day
+REDIS_RESULT_TTL = 86400
+# Finished research results are memoized there too, for an hour, keyed by query, model and tools
+REDIS_RESEARCH_TTL = 3600
+
+@lru_cache(maxsize=1)
+def _get_redis():
+    """Shared Redis client (with its own connection pool), or None when Redis is not configured"""
+    url = os.getenv("REDIS_URL")
+    if redis is None or not url:
+        return None
+    return redis.Redis.from_url(url, socket_keepalive=True)
+
+# Tool schemas are also cached on disk, valid while the pokebase version and the schema
+# format below stay the same; bump TOOLS_SCHEMA_VERSION when _build_pokebase_tools changes
+TOOLS_CACHE_PATH = os.getenv("POKEBASE_TOOLS_CACHE", ".pokebase_tools.cache.json")
+TOOLS_SCHEMA_VERSION = 2
+
+def _tools_cache_key() -> str:
+    """Identify the pokebase release and schema format the cached tool schemas were built from"""
+    try:
+        pokebase_version = importlib.metadata.version("pokebase")
+    except importlib.metadata.PackageNotFoundError:
+        pokebase_version = "unknown"
+    return f"pokebase-{pokebase_version}/schema-{TOOLS_SCHEMA_VERSION}"
+
+# Tool schemas and callables built from a loaders module, keyed by id(module) and shared by all agents
+_TOOLS_CACHE: Dict[int, tuple] = {}
 
 class PokemonResearchAgent:
     """
@@ -12,179 +388,275 @@ class PokemonResearchAgent:
     
     def __init__(self, model: str = "gpt-4-turbo-preview", simulation=False):
         self._is_simulation_mode = simulation
-        api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=api_key)
+        _load_env_once()
+        self.client = _get_client(os.getenv("OPENAI_API_KEY"))
         self.model = model
         self.tools = []
         self.tool_functions = {}
-        self.knowledge_base = {}  # Store accumulated knowledge
-        self.function_cache = {}  # Cache for function call results
+        self._tools_json = b"[]"  # self.tools pre-serialized
+        self._tools_hash = b""  # Digest of _tools_json, part of the research memo key
+        self.function_cache = BoundedCache(FUNCTION_CACHE_SIZE)  # Cache for function call results
         self.current_session_calls = set()  # Track calls made in current research session
-        self._load_pokebase_tools()
+        self._cache_lock = threading.Lock()  # Guards the caches above against concurrent tool calls
+        self.redis = _get_redis()  # Cross-process tool result cache, if configured
+        if not simulation:
+            self._load_pokebase_tools()
     
     def _load_pokebase_tools(self):
         """Dynamically load all functions from pokebase.loaders as OpenAI function tools"""
         
+        # Introspection runs once per process; later agents reuse the built schemas
+        loaders = _get_loaders()
+        cached = _TOOLS_CACHE.get(id(loaders))
+        if cached is None:
+            # Across processes the schemas come from the on-disk cache while pokebase is unchanged
+            cached = self._read_tools_cache(loaders)
+            if cached is None:
+                cached = self._build_pokebase_tools(loaders)
+                self._write_tools_cache(cached[0])
+            _TOOLS_CACHE[id(loaders)] = cached
+        tools, tool_functions, tools_json = cached
+        self.tools = list(tools)
+        self.tool_functions = dict(tool_functions)
+        self._tools_json = tools_json
+        self._tools_hash = hashlib.blake2b(tools_json, digest_size=16).digest()
+    
+    def _read_tools_cache(self, loaders) -> Optional[tuple]:
+        """Load (tools, tool_functions, tools_json) from TOOLS_CACHE_PATH if it matches this pokebase"""
+        try:
+            with open(TOOLS_CACHE_PATH, "rb") as f:
+                tools_json = f.read()
+            cached = orjson.loads(tools_json)
+            if cached.get("key") != _tools_cache_key():
+                return None
+            tools = cached["tools"]
+            tool_functions = {
+                tool["function"]["name"]: getattr(loaders, tool["function"]["name"].removeprefix("pokebase_"))
+                for tool in tools
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        return tools, tool_functions, orjson.dumps(tools)
+    
+    def _write_tools_cache(self, tools: List[Dict]) -> None:
+        """Save freshly built tool schemas to TOOLS_CACHE_PATH for later processes"""
+        tmp_path = f"{TOOLS_CACHE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps({"key": _tools_cache_key(), "tools": tools}))
+            os.replace(tmp_path, TOOLS_CACHE_PATH)
+        except OSError as e:
+            logger.warning("Could not write the tool schema cache: %s", e)
+    
+    def _build_pokebase_tools(self, loaders) -> tuple:
+        """Introspect pokebase.loaders into (tool schemas, {tool name: function}, schemas as JSON)"""
+        tools = []
+        tool_functions = {}
+        
         # Get all functions from pokebase.loaders module
         for name, obj in inspect.getmembers(loaders):
             if inspect.isfunction(obj) and not name.startswith('_'):
-                # Get function signature and docstring
-                sig = inspect.signature(obj)
-                doc = inspect.getdoc(obj) or "No description available"
-                
-                # Parse parameters
-                parameters = {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-                
-                for param_name, param in sig.parameters.items():
-                    param_type = self._get_param_type(param)
-                    param_desc = self._extract_param_description(doc, param_name)
-                    
-                    parameters["properties"][param_name] = {
-                        "type": param_type,
-                        "description": param_desc
-                    }
-                    
-                    # Add to required if no default value
-                    if param.default == inspect.Parameter.empty:
-                        parameters["required"].append(param_name)
+                tool_name = "pokebase_" + name
+                params, required = _sig_cache(obj)
+                description, param_descs = _doc_cache(obj)
                 
                 # Create OpenAI function tool schema
                 tool_schema = {
                     "type": "function",
                     "function": {
-                        "name": f"pokebase_{name}",
-                        "description": self._clean_docstring(doc),
-                        "parameters": parameters
+                        "name": tool_name,
+                        "description": description,
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                param_name: {**param_schema, "description": param_descs[param_name]}
+                                for param_name, param_schema in params
+                            },
+                            "required": list(required)
+                        }
                     }
                 }
                 
-                self.tools.append(tool_schema)
-                self.tool_functions[f"pokebase_{name}"] = obj
+                tools.append(tool_schema)
+                tool_functions[tool_name] = obj
                 
-                print(f"Loaded tool: pokebase_{name}")
-    
-    def _get_param_type(self, param) -> str:
-        """Convert Python parameter type to JSON schema type"""
-        if param.annotation == inspect.Parameter.empty:
-            return "string"  # Default to string if no annotation
-        
-        type_map = {
-            str: "string",
-            int: "integer",
-            float: "number",
-            bool: "boolean",
-            list: "array",
-            dict: "object"
-        }
-        
-        return type_map.get(param.annotation, "string")
-    
-    def _extract_param_description(self, docstring: str, param_name: str) -> str:
-        """Extract parameter description from docstring"""
-        if not docstring:
-            return f"Parameter {param_name}"
-        
-        # Simple extraction - look for parameter descriptions
-        lines = docstring.split('\n')
-        for i, line in enumerate(lines):
-            if param_name in line and ':' in line:
-                return line.split(':')[-1].strip()
-        
-        return f"Parameter {param_name}"
-    
-    def _clean_docstring(self, docstring: str) -> str:
-        """Clean and format docstring for OpenAI function description"""
-        if not docstring:
-            return "Pokemon data function"
-        
-        # Take first line or first sentence
-        lines = docstring.strip().split('\n')
-        first_line = lines[0].strip()
-        
-        # Limit length for OpenAI function descriptions
-        if len(first_line) > 200:
-            first_line = first_line[:197] + "..."
+                logger.debug("Loaded tool: %s", tool_name)
         
-        return first_line
+        # The schemas never change after loading, so they are serialized once here
+        return tools, tool_functions, orjson.dumps(tools)
     
-    def _explore_object_recursively(self, obj: Any, max_depth: int = 3, current_depth: int = 0) -> Dict:
+    def _explore_object_recursively(self, obj: Any, max_depth: int = 3, current_depth: int = 0,
+                                    list_sample: int = 5, dict_sample: int = 15,
+                                    max_bytes: int = EXPLORE_MAX_BYTES) -> Dict:
         """
-        Recursively explore object attributes using __dict__ method
-        """
-        if current_depth >= max_depth:
-            return {"_truncated": "Max depth reached"}
+        Explore object attributes using __dict__, iteratively with an explicit work stack
         
-        if obj is None:
-            return None
+        Each container is allocated and attached to its parent before its children are
+        filled in, so deep pokebase objects cost no Python call frames or recursion depth.
+        Besides the depth and per-container sample limits, the output is capped at roughly
+        max_bytes of JSON. A dict or object reached a second time (a shared sub-resource or
+        a back-reference) is explored only once: the first copy gets an "_id" and later
+        occurrences become {"_ref": <that id>}. Shared lists cannot carry an "_id" and are
+        copied again each time.
+        """
+        root = [None]
+        stack = deque([(root, 0, obj, current_depth)])
+        pop, push, extend = stack.pop, stack.append, stack.extend
+        kinds = _NODE_KINDS
+        prims = _PRIMITIVE_TYPES
+        budget = max_bytes
+        seen: Dict[int, Any] = {}  # id(source node) -> explored container
+        refs: Dict[int, int] = {}  # id(source node) -> "_id" handed out for it
+        while stack:
+            if budget <= 0:
+                _truncate_pending(stack)
+                break
+            
+            parent, key, node, depth = pop()
+            
+            if depth >= max_depth:
+                parent[key] = {"_truncated": "Max depth reached"}
+                budget -= 36
+                continue
+            
+            kind = kinds.get(type(node))
+            if kind is None:
+                kind = _resolve_node_kind(node)
+            
+            # Handle None and primitive types
+            if kind is _LEAF:
+                parent[key] = node
+                budget -= len(node) + 3 if type(node) is str else 6
+                continue
+            
+            # Pokebase objects reference each other (species <-> evolution chain) and share
+            # sub-resources; emit a reference instead of exploring the same object again
+            if kind is not _OTHER and kind is not _LIST:
+                node_id = id(node)
+                first = seen.get(node_id)
+                if first is not None:
+                    ref = refs.get(node_id)
+                    if ref is None:
+                        ref = refs[node_id] = len(refs) + 1
+                        first["_id"] = ref
+                    parent[key] = {"_ref": ref}
+                    budget -= 12
+                    continue
+            
+            # Handle lists, sampling the first few items
+            if kind is _LIST:
+                child = parent[key] = node[:list_sample]
+                budget -= 2 + len(child)
+                # Primitives were already copied into place by the slice, so above the depth limit
+                # they are only charged to the budget instead of taking a stack round trip. Once
+                # the budget is spent the rest is pushed, to be cut by _truncate_pending.
+                inline = depth + 1 < max_depth
+                items = []
+                for i, item in enumerate(child):
+                    if inline and budget > 0 and type(item) in prims:
+                        budget -= len(item) + 3 if type(item) is str else 6
+                    else:
+                        items.append((child, i, item, depth + 1))
+                # Pushed in reverse so items are explored (and spend the budget) in order
+                extend(reversed(items))
+                continue
+            
+            # Handle dictionaries; the sampled entries are copied in one go (keys keep their
+            # order and the dict is sized once) and each value is replaced once explored
+            if kind is _DICT:
+                child = parent[key] = dict(islice(node.items(), dict_sample))
+            
+            # Handle pokebase resources through their instance dict only: any other attribute
+            # access goes through APIResource.__getattr__, which fetches the resource over HTTP.
+            # Nested references that were never loaded are emitted as flat stubs.
+            elif kind is _RESOURCE:
+                data = vars(node)
+                if data.get('_APIResource__loaded'):
+                    child = parent[key] = {k: v for k, v in data.items() if not k.startswith('_')}
+                else:
+                    stub = seen[node_id] = parent[key] = {k: data[k] for k in _RESOURCE_STUB_KEYS if k in data}
+                    budget -= 2 + _ENTRY_BYTES * len(stub) + sum(len(str(v)) for v in stub.values())
+                    continue
+            
+            # Handle objects with __dict__, skipping private attributes
+            elif kind is _OBJECT:
+                child = parent[key] = {k: v for k, v in node.__dict__.items() if not k.startswith('_')}
+            
+            # Handle other objects by converting to string
+            else:
+                try:
+                    parent[key] = str(node)
+                except:
+                    parent[key] = f"<{type(node).__name__} object>"
+                budget -= len(parent[key]) + 3
+                continue
+            
+            seen[node_id] = child
+            budget -= 2 + _ENTRY_BYTES * len(child)
+            inline = depth + 1 < max_depth
+            items = []
+            for k, v in child.items():
+                if inline and budget > 0 and type(v) in prims:
+                    budget -= len(v) + 3 if type(v) is str else 6
+                else:
+                    items.append((child, k, v, depth + 1))
+            extend(reversed(items))
         
-        # Handle primitive types
-        if isinstance(obj, (str, int, float, bool)):
-            return obj
-        
-        # Handle lists
-        if isinstance(obj, list):
-            if len(obj) == 0:
-                return []
-            # Sample first few items
-            sample_size = min(5, len(obj))  # Increased sample size
-            return [self._explore_object_recursively(item, max_depth, current_depth + 1) 
-                   for item in obj[:sample_size]]
-        
-        # Handle dictionaries
-        if isinstance(obj, dict):
-            return {k: self._explore_object_recursively(v, max_depth, current_depth + 1) 
-                   for k, v in list(obj.items())[:15]}  # Increased limit
-        
-        # Handle objects with __dict__
-        if hasattr(obj, '__dict__'):
-            obj_dict = {}
-            for key, value in obj.__dict__.items():
-                if not key.startswith('_'):  # Skip private attributes
-                    obj_dict[key] = self._explore_object_recursively(value, max_depth, current_depth + 1)
-            return obj_dict
-        
-        # Handle other objects by converting to string
-        try:
-            return str(obj)
-        except:
-            return f"<{type(obj).__name__} object>"
+        return root[0]
     
     def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Execute a pokebase tool function with caching to avoid repetition"""
-        # Create cache key from tool name and arguments
-        cache_key = f"{tool_name}_{json.dumps(arguments, sort_keys=True)}"
+        # Create cache key from tool name and a 16-byte digest of the canonical (sorted, compact)
+        # arguments, so keys stay small in memory and in Redis however large the arguments are
+        args_digest = hashlib.blake2b(orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+        cache_key = b"%s:%s" % (tool_name.encode(), args_digest)
         
-        # Check if we already have this result cached
-        if cache_key in self.function_cache:
-            return self.function_cache[cache_key]
+        # Tool calls of one turn run on several threads; the shared caches are only touched under the lock
+        with self._cache_lock:
+            # Check if we already have this result cached (results are cached as UTF-8 JSON bytes)
+            # A call of this session whose result has since been evicted is simply made again
+            if cache_key in self.function_cache:
+                return _clip_tool_content(self.function_cache[cache_key].decode())
         
-        # Check if this exact call was made in current session
-        if cache_key in self.current_session_calls:
-            return f"[CACHED] This exact function call was already made in this research session. Result: {self.function_cache.get(cache_key, 'Result not found in cache')}"
+        # Another process (or an earlier run) may already have made this call
+        redis_key = None
+        if self.redis is not None:
+            redis_key = b"pokebase:" + cache_key
+            try:
+                cached = self.redis.get(redis_key)
+            except redis.RedisError as e:
+                logger.warning("Redis lookup failed, using the in-memory cache only: %s", e)
+                cached = redis_key = None
+            if cached is not None:
+                with self._cache_lock:
+                    self.function_cache[cache_key] = cached
+                    self.current_session_calls.add(cache_key)
+                return _clip_tool_content(cached.decode())
         
         try:
-            if tool_name not in self.tool_functions:
+            func = self.tool_functions.get(tool_name)
+            if func is None:
                 return f"Tool {tool_name} not found"
             
-            func = self.tool_functions[tool_name]
             result = func(**arguments)
             
-            # Store result in knowledge base for future reference
-            self.knowledge_base[cache_key] = result
-            
             # Explore the result object recursively
-            explored_result = self._explore_object_recursively(result, max_depth=4)
+            explored_result = self._explore_object_recursively(result, max_depth=4, max_bytes=TOOL_RESULT_BUDGET)
             
-            # Cache the result
-            result_json = json.dumps(explored_result, indent=2, default=str)
-            self.function_cache[cache_key] = result_json
-            self.current_session_calls.add(cache_key)
+            # Cache the result as the bytes orjson produces; it is decoded only for the model
+            # Compact JSON: indentation only adds tokens to every later request in the loop
+            result_json = orjson.dumps(explored_result, default=str, option=orjson.OPT_NON_STR_KEYS)
+            with self._cache_lock:
+                self.function_cache[cache_key] = result_json
+                self.current_session_calls.add(cache_key)
             
-            return result_json
+            if redis_key is not None:
+                try:
+                    self.redis.set(redis_key, result_json, ex=REDIS_RESULT_TTL)
+                except redis.RedisError as e:
+                    logger.warning("Redis store failed: %s", e)
+            
+            return _clip_tool_content(result_json.decode())
             
         except Exception as e:
             error_msg = f"Error executing {tool_name}: {str(e)}"
@@ -193,22 +665,17 @@ class PokemonResearchAgent:
                 error_msg += f"\nSuggestion: Check if the parameter values are correct. Available arguments were: {arguments}"
             
             # Cache error results too to avoid repeating failed calls
-            self.function_cache[cache_key] = error_msg
-            self.current_session_calls.add(cache_key)
+            with self._cache_lock:
+                self.function_cache[cache_key] = error_msg.encode()
+                self.current_session_calls.add(cache_key)
             
             return error_msg
     
-    def _synthesize_knowledge(self, query: str, messages: List[Dict], function_calls: List) -> str:
-        """Synthesize collected knowledge into a comprehensive response"""
+    def _synthesize_knowledge(self, query: str, messages: List[Dict], function_calls: List) -> Optional[str]:
+        """Synthesize collected knowledge into a comprehensive response, or None if the model call fails"""
         
         # Extract tool results from messages
-        tool_results = []
-        for msg in messages:
-            if msg.get("role") == "tool":
-                tool_results.append({
-                    "tool": msg.get("name", "unknown"),
-                    "content": msg.get("content", "")
-                })
+        tool_results = _collect_tool_results(messages)
         
         # Create a synthesis prompt
         synthesis_prompt = f"""
@@ -217,7 +684,7 @@ class PokemonResearchAgent:
         The following tool functions were called: {[f[0] for f in function_calls]}
         
         Tool results obtained:
-        {json.dumps(tool_results[:5], indent=2)}  # Limit to first 5 results to avoid token limits
+        {_format_tool_results(tool_results)}
         
         Please provide a comprehensive analysis that:
         1. Directly answers the user's question
@@ -230,7 +697,7 @@ class PokemonResearchAgent:
         """
         
         try:
-            synthesis_response = self.client.chat.completions.create(
+            synthesis_response = self._chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a Pokemon research analyst. Synthesize the provided data into a comprehensive, well-organized response."},
@@ -242,9 +709,24 @@ class PokemonResearchAgent:
             return synthesis_response.choices[0].message.content
             
         except Exception as e:
-            print(f"Synthesis error: {e}")
-            # Fallback: create a basic summary
-            return self._create_fallback_summary(query, function_calls, tool_results)
+            logger.warning("Synthesis failed: %s", e)
+            return None
+    
+    def _summarize_in_conversation(self, messages: List[Dict], fresh_from: int,
+                                   temperature: float = RESEARCH_TEMPERATURE) -> Optional[str]:
+        """Ask the model to answer from the tool results it has already seen, without more tool calls"""
+        try:
+            response = self._chat_completion(
+                model=self.model,
+                messages=_compact_history(messages, fresh_from) + [{"role": "user", "content": SUMMARIZE_NOW_PROMPT}],
+                tools=self.tools,
+                tool_choice="none",
+                temperature=temperature
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            logger.warning("In-conversation summary failed: %s", e)
+            return None
     
     def _create_fallback_summary(self, query: str, function_calls: List, tool_results: List) -> str:
         """Create a fallback summary when synthesis fails"""
@@ -264,9 +746,101 @@ class PokemonResearchAgent:
         
         return summary
     
-    def research(self, query: str, max_iterations: int = 4) -> dict:  # Increased iterations
+    def _chat_completion(self, **kwargs):
+        """chat.completions.create, retried with exponential backoff on rate limits and timeouts"""
+        for attempt in range(1, CHAT_MAX_ATTEMPTS + 1):
+            try:
+                return self.client.chat.completions.create(**kwargs)
+            except (RateLimitError, APITimeoutError) as e:
+                if attempt == CHAT_MAX_ATTEMPTS:
+                    raise
+                delay = min(CHAT_BACKOFF_MAX, CHAT_BACKOFF_MIN * 2 ** (attempt - 1))
+                logger.warning("Chat completion attempt %d failed (%s), retrying in %ss", attempt, e, delay)
+                time.sleep(delay)
+    
+    def _stream_turn(self, messages: List[Dict], executor: ThreadPoolExecutor,
+                     temperature: float = RESEARCH_TEMPERATURE) -> tuple:
+        """
+        Stream one assistant turn, submitting each tool call to the executor as soon as it is complete
+        
+        Returns the assistant message as a dict for the history, and the submitted tool calls as
+        (tool_call_id, tool_name, arguments, future) tuples in call order.
+        """
+        stream = self._chat_completion(
+            model=self.model,
+            messages=messages,
+            tools=self.tools,
+            tool_choice="auto",
+            parallel_tool_calls=True,  # Independent lookups come back in one turn and run concurrently
+            temperature=temperature,
+            stream=True
+        )
+        
+        content = []
+        tool_calls = {}  # Stream index -> accumulated tool call
+        pending = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+            for tool_call_delta in delta.tool_calls or []:
+                tool_call = tool_calls.get(tool_call_delta.index)
+                if tool_call is None:
+                    # Tool calls stream one after another, so a new index completes the previous ones
+                    for ready in list(tool_calls.values())[len(pending):]:
+                        pending.append(self._submit_tool_call(executor, ready))
+                    tool_call = tool_calls[tool_call_delta.index] = {
+                        "id": "", "type": "function", "function": {"name": "", "arguments": ""}
+                    }
+                if tool_call_delta.id:
+                    tool_call["id"] = tool_call_delta.id
+                if tool_call_delta.function:
+                    tool_call["function"]["name"] += tool_call_delta.function.name or ""
+                    tool_call["function"]["arguments"] += tool_call_delta.function.arguments or ""
+                    
+                    # Arguments that already form a complete JSON object mean the call is done; start it
+                    # without waiting for the next call or the end of the stream to confirm that
+                    arguments = tool_call["function"]["arguments"]
+                    if len(pending) < len(tool_calls) and arguments.endswith("}") and tool_call["function"]["name"]:
+                        try:
+                            parsed = orjson.loads(arguments)
+                        except orjson.JSONDecodeError:
+                            parsed = None
+                        if parsed is not None:
+                            pending.append(self._submit_tool_call(executor, tool_call, parsed))
+        for ready in list(tool_calls.values())[len(pending):]:
+            pending.append(self._submit_tool_call(executor, ready))
+        
+        message_dict = {"role": "assistant", "content": "".join(content) or None}
+        if tool_calls:
+            message_dict["tool_calls"] = list(tool_calls.values())
+        return message_dict, pending
+    
+    def _submit_tool_call(self, executor: ThreadPoolExecutor, tool_call: Dict, arguments: Optional[Dict] = None) -> tuple:
+        """Parse a complete tool call (unless its arguments are already parsed) and start executing it"""
+        tool_name = tool_call["function"]["name"]
+        if arguments is None:
+            arguments = orjson.loads(tool_call["function"]["arguments"] or "{}")
+        if not isinstance(arguments, dict):
+            # Answer with an error the model can read instead of aborting the whole iteration
+            future = Future()
+            future.set_result(f"Error executing {tool_name}: arguments must be a JSON object, "
+                              f"got {type(arguments).__name__}: {tool_call['function']['arguments']}")
+            return tool_call["id"], tool_name, arguments, future
+        # Drop stray catch-all parameters the model sometimes fills in
+        arguments.pop("args", None)
+        arguments.pop("kwargs", None)
+        return tool_call["id"], tool_name, arguments, executor.submit(self._execute_tool, tool_name, arguments)
+    
+    def research(self, query: str, max_iterations: int = 4, bypass_cache: bool = False,
+                 temperature: float = RESEARCH_TEMPERATURE) -> dict:  # Increased iterations
         """
         Conduct Pokemon research based on user query - always returns meaningful results
+
+        Successful results are memoized in Redis (when configured) for REDIS_RESEARCH_TTL;
+        bypass_cache skips the lookup and researches afresh, refreshing the memo.
         """
         # Reset session tracking for new research query
         self.current_session_calls.clear()
@@ -280,88 +854,128 @@ class PokemonResearchAgent:
                 "cached_calls": 0,
                 "unique_calls": 0
             }
-        
-        system_prompt = """You are a Pokemon research assistant with access to the pokebase library functions.
 
-IMPORTANT INSTRUCTIONS:
-1. Use the available pokebase functions to gather detailed Pokemon data
-2. When you receive abstract objects in function responses, they have been automatically explored using __dict__ recursively
-3. The function responses contain comprehensive nested data structures - examine them carefully
-4. Look for relationships between different data points (e.g., Pokemon types, abilities, stats, moves)
-5. Be persistent - if one approach doesn't work, try different function calls or parameters
-6. If you encounter errors, try alternative approaches or similar Pokemon names
-7. Always provide analysis even with partial data
-8. Use specific Pokemon names, move names, type names as they appear in the Pokemon database
-9. AVOID REPEATING THE SAME FUNCTION CALLS - if you see [CACHED] in a response, that means you already made that exact call
-10. Build upon previous results rather than repeating the same queries
-11. If you get sufficient data, proceed to analysis rather than making more calls
-
-Available functions are all from pokebase.loaders module and are prefixed with 'pokebase_'.
-
-Your goal is to provide comprehensive, accurate, and insightful Pokemon research based on the user's query."""
-
-        messages = [
-            {"role": "system", "content": system_prompt},
+        # The same query against the same model and tools is answered from the memo
+        memo_key = None
+        if self.redis is not None:
+            memo_key = b"research:" + hashlib.blake2b(
+                orjson.dumps([query, self.model, max_iterations, temperature]) + self._tools_hash, digest_size=16
+            ).hexdigest().encode()
+            if not bypass_cache:
+                try:
+                    cached = self.redis.get(memo_key)
+                except redis.RedisError as e:
+                    logger.warning("Redis lookup failed, researching without the memo: %s", e)
+                    cached = memo_key = None
+                if cached is not None:
+                    return orjson.loads(cached)
+        
+        messages = self._initial_messages(query)
+        
+        # Pokemon named in the query are fetched up front, in parallel, so the model starts with
+        # their data instead of spending a tool round per Pokemon
+        prefetched = self._bulk_fetch(_find_pokemon_names(query))
+        if prefetched:
+            # Added as an already answered tool turn, so the results are compacted to previews
+            # after the first turn like any other tool output and show up in the reasoning
+            tool_calls = [
+                {"id": f"prefetch_{i}", "type": "function",
+                 "function": {"name": "pokebase_pokemon", "arguments": orjson.dumps({"id_or_name": name}).decode()}}
+                for i, (name, _) in enumerate(prefetched)
+            ]
+            messages.append({"role": "assistant", "content": None, "tool_calls": tool_calls})
+            messages.extend(
+                {"tool_call_id": tool_call["id"], "role": "tool", "name": "pokebase_pokemon", "content": result}
+                for tool_call, (_, result) in zip(tool_calls, prefetched)
+            )
+        
+        result = self._research_loop(query, messages, max_iterations, temperature=temperature,
+                                     history=[("pokebase_pokemon", {"id_or_name": name}) for name, _ in prefetched])
+        
+        # Failures are not memoized, so a transient API error is retried on the next request
+        if memo_key is not None and result["success"]:
+            try:
+                self.redis.setex(memo_key, REDIS_RESEARCH_TTL, orjson.dumps(result, default=str))
+            except redis.RedisError as e:
+                logger.warning("Redis store failed: %s", e)
+        return result
+    
+    def _initial_messages(self, query: str) -> List[Dict]:
+        """Build the opening conversation for a research query"""
+        return [
+            {"role": "system", "content": RESEARCH_SYSTEM_PROMPT},
             {"role": "user", "content": query}
         ]
-        function_call_history = []
+    
+    def _bulk_fetch(self, names: List[str]) -> List[tuple]:
+        """Run pokebase_pokemon for several names concurrently, returning (name, result) for the successful ones"""
+        if not names or "pokebase_pokemon" not in self.tool_functions:
+            return []
+        with ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS) as executor:
+            results = list(executor.map(
+                lambda name: self._execute_tool("pokebase_pokemon", {"id_or_name": name}), names
+            ))
+        return [(name, result) for name, result in zip(names, results) if not result.startswith("Error executing")]
+    
+    def _research_loop(self, query: str, messages: List[Dict], max_iterations: int,
+                       planned_message: Optional[Dict] = None,
+                       temperature: float = RESEARCH_TEMPERATURE,
+                       history: Optional[List[tuple]] = None) -> dict:
+        """
+        Run the tool-calling loop for a query and assemble the research result
+        
+        planned_message is an assistant turn that was already generated elsewhere (e.g. by the
+        Batch API); it is used as the first iteration instead of asking the model again.
+        history lists the (tool name, arguments) calls already answered in messages.
+        """
+        self.current_session_calls.clear()
+        function_call_history = list(history or ())
+        model_replied = False  # Prefetched history alone does not make a result
         final_response = None
         cached_calls = 0
+        fresh_from = 0  # Tool outputs before this index have already been read by the model
         
-        for iteration in range(max_iterations):
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=self.tools,
-                    tool_choice="auto",
-                    temperature=0.3  # Lower temperature for more focused responses
-                )
-                
-                message = response.choices[0].message
-                
-                # Convert message to dict format for messages list
-                message_dict = {
-                    "role": message.role,
-                    "content": message.content
-                }
-                
-                # Add tool calls if they exist
-                if message.tool_calls:
-                    message_dict["tool_calls"] = message.tool_calls
-                
-                messages.append(message_dict)
-                
-                if message.tool_calls:
-                    # Execute tool calls
-                    for tool_call in message.tool_calls:
-                        tool_name = tool_call.function.name
-                        arguments = json.loads(tool_call.function.arguments)
-                        for rogue_arg in ["args", "kwargs"]:
-                            if rogue_arg in arguments:
-                                arguments.pop(rogue_arg)
-
-                        function_call_history.append((tool_name, arguments))
-                        result = self._execute_tool(tool_name, arguments)
-                        
-                        # Count cached calls
-                        if result.startswith("[CACHED]"):
-                            cached_calls += 1
+        # Tool calls from one assistant turn are independent pokebase lookups; run them concurrently
+        with ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS) as executor:
+            for iteration in range(max_iterations):
+                try:
+                    if iteration == 0 and planned_message is not None:
+                        message_dict = planned_message
+                        pending = [self._submit_tool_call(executor, tool_call)
+                                   for tool_call in planned_message.get("tool_calls") or []]
+                    else:
+                        # Send older tool outputs as previews; the full text stays in messages for synthesis
+                        request_messages = _compact_history(messages, fresh_from)
+                        # Tool calls start executing while the rest of the response is still streaming
+                        message_dict, pending = self._stream_turn(request_messages, executor, temperature)
+                    messages.append(message_dict)
+                    model_replied = True
+                    fresh_from = len(messages)
+                    
+                    if pending:
+                        # Collect results in the original call order
+                        for tool_call_id, tool_name, arguments, future in pending:
+                            function_call_history.append((tool_name, arguments))
+                            result = future.result()
+                            
+                            # Count cached calls
+                            if result.startswith("[CACHED]"):
+                                cached_calls += 1
+                            
+                            messages.append({
+                                "tool_call_id": tool_call_id,
+                                "role": "tool",
+                                "name": tool_name,
+                                "content": result
+                            })
+                    else:
+                        # No more tool calls, store the response
+                        final_response = message_dict["content"]
+                        break
                         
-                        messages.append({
-                            "tool_call_id": tool_call.id,
-                            "role": "tool",
-                            "name": tool_name,
-                            "content": result
-                        })
-                else:
-                    # No more tool calls, store the response
-                    final_response = message.content
+                except Exception as e:
+                    logger.warning("Error in iteration %d: %s", iteration + 1, e)
                     break
-                    
-            except Exception as e:
-                print(f"Error in iteration {iteration + 1}: {e}")
-                break
         
         # Calculate unique calls
         unique_calls = len(function_call_history) - cached_calls
@@ -370,10 +984,17 @@ Your goal is to provide comprehensive, accurate, and insightful Pokemon research
         if final_response:
             results = final_response
             success = True
-        elif function_call_history:
-            # Synthesize available knowledge if we have any data
-            results = self._synthesize_knowledge(query, messages, function_call_history)
-            success = True
+        elif function_call_history and model_replied:
+            # Out of iterations: ask for the answer in the same conversation, and only fall back
+            # to a separate synthesis call if that turn fails
+            results = (self._summarize_in_conversation(messages, fresh_from, temperature)
+                       or self._synthesize_knowledge(query, messages, function_call_history))
+            # Without any answer from the model the result is only a dump of the raw data,
+            # reported as unsuccessful so it is neither memoized nor cached by callers
+            success = results is not None
+            if not success:
+                results = self._create_fallback_summary(query, function_call_history,
+                                                        _collect_tool_results(messages))
         else:
             # No data collected at all
             results = f"I wasn't able to collect specific data for your query: '{query}'. This could be due to:\n" \
@@ -388,17 +1009,85 @@ Your goal is to provide comprehensive, accurate, and insightful Pokemon research
             "reasoning": function_call_history,
             "success": success,
             "iterations_used": min(iteration + 1, max_iterations),
-            "knowledge_entries": len(self.knowledge_base),
+            "knowledge_entries": len(self.function_cache),
             "cached_calls": cached_calls,
             "unique_calls": unique_calls,
             "efficiency_ratio": f"{unique_calls}/{len(function_call_history)}" if function_call_history else "0/0"
         }
     
+    def research_batch(self, queries: List[str], max_iterations: int = 4,
+                       poll_interval: float = BATCH_POLL_INTERVAL,
+                       temperature: float = RESEARCH_TEMPERATURE) -> List[dict]:
+        """
+        Research several independent queries, planning them all through one OpenAI batch job
+        
+        The Batch API cannot drive an interactive tool-calling loop, so only the first (planning)
+        turn of every query goes through the batch; the remaining iterations run synchronously.
+        Queries whose batch request failed are researched from scratch with research().
+        """
+        if self._is_simulation_mode or not queries:
+            return [self.research(query, max_iterations, temperature=temperature) for query in queries]
+        
+        lines = []
+        for i, query in enumerate(queries):
+            body = orjson.dumps({
+                "model": self.model,
+                "messages": self._initial_messages(query),
+                "tool_choice": "auto",
+                "parallel_tool_calls": True,
+                "temperature": temperature
+            })
+            # Splice in the tool schemas serialized once at load time instead of re-encoding them per line
+            body = body[:-1] + b',"tools":' + self._tools_json + b'}'
+            lines.append(b'{"custom_id":"%d","method":"POST","url":"/v1/chat/completions","body":%s}' % (i, body))
+        
+        planned = {}
+        try:
+            batch_file = self.client.files.create(
+                file=("research_batch.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            while batch.status not in BATCH_TERMINAL_STATUSES:
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+        
+            if batch.status == "completed" and batch.output_file_id:
+                for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                    if not line.strip():
+                        continue
+                    entry = orjson.loads(line)
+                    response = entry.get("response") or {}
+                    if entry.get("error") or response.get("status_code") != 200:
+                        continue
+                    message = response["body"]["choices"][0]["message"]
+                    message_dict = {"role": "assistant", "content": message.get("content")}
+                    if message.get("tool_calls"):
+                        message_dict["tool_calls"] = message["tool_calls"]
+                    planned[int(entry["custom_id"])] = message_dict
+            else:
+                logger.warning("Research batch %s ended with status %s", batch.id, batch.status)
+        except Exception as e:
+            logger.warning("Research batch failed, falling back to synchronous research: %s", e)
+        
+        results = []
+        for i, query in enumerate(queries):
+            if i in planned:
+                results.append(self._research_loop(query, self._initial_messages(query), max_iterations,
+                                                   planned[i], temperature))
+            else:
+                results.append(self.research(query, max_iterations, temperature=temperature))
+        return results
+    
     def get_research_summary(self) -> dict:
         """Get a summary of all research conducted in this session"""
         return {
             "total_tools_available": len(self.tools),
-            "knowledge_base_size": len(self.knowledge_base),
+            "tools_schema_bytes": len(self._tools_json),
             "function_cache_size": len(self.function_cache),
             "current_session_calls": len(self.current_session_calls),
             "available_tools": [tool['function']['name'] for tool in self.tools]
@@ -408,7 +1097,7 @@ Your goal is to provide comprehensive, accurate, and insightful Pokemon research
         """Clear the function cache - useful for testing or memory management"""
         self.function_cache.clear()
         self.current_session_calls.clear()
-        print("Function cache cleared")
+        logger.debug("Function cache cleared")
 
 def main():
     """Example usage of the Enhanced Pokemon Research Agent"""
@@ -436,7 +1125,19 @@ def main():
         print(f"- {tool['function']['name']}: {tool['function']['description']}")
     if len(agent.tools) > 10:
         print(f"... and {len(agent.tools) - 10} more tools")
-    
+
+    # Non-interactive mode: research all example queries through one batch job
+    if "--batch" in sys.argv[1:]:
+        print(f"\nSubmitting {len(research_queries)} queries as a batch (this can take a while)...")
+        for query, result in zip(research_queries, agent.research_batch(research_queries)):
+            print("\n" + "="*60)
+            print(f"Researching: {query}")
+            print("-" * 50)
+            print(result['results'])
+            print(f"\nResearch Status: {'Success' if result['success'] else 'Partial'}")
+            print(f"Function calls made: {len(result['reasoning'])}")
+        return
+
     # Interactive mode
     print("\n" + "="*60)
     print("ENHANCED POKEMON RESEARCH AGENT - Interactive Mode")
@@ -456,7 +1157,6 @@ def main():
             summary = agent.get_research_summary()
             print(f"\nSession Summary:")
             print(f"- Available tools: {summary['total_tools_available']}")
-            print(f"- Knowledge base entries: {summary['knowledge_base_size']}")
             print(f"- Function cache size: {summary['function_cache_size']}")
             print(f"- Current session calls: {summary['current_session_calls']}")
             continue